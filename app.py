@@ -2,9 +2,10 @@ import os
 import logging
 import base64
 from flask import Flask, jsonify, request, session, send_from_directory
-from utils.reddit_utils import get_subreddit_info, get_subreddit_posts, get_comment_thread
+from utils.reddit_utils import get_subreddit_info, get_subreddit_posts, get_comment_thread, search_subreddit_posts
 from utils.sentiment import analyze_subreddit_sentiment
 from utils.meme_fetcher import get_memes
+from utils.compare import compare_subreddits, parse_subreddit_names
 
 # Set up logging
 logging.basicConfig(level=logging.DEBUG)
@@ -98,10 +99,58 @@ def subreddit_sentiment():
     try:
         sentiment_data = analyze_subreddit_sentiment(subreddit_name, keyword, limit)
         return jsonify(sentiment_data)
+    except ValueError as e:
+        return jsonify({'error': f"Invalid keyword query: {e}"}), 400
     except Exception as e:
         logger.error(f"Error analyzing subreddit sentiment: {e}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/search', methods=['GET'])
+def search_posts():
+    subreddit_name = request.args.get('name')
+    query = request.args.get('q', '')
+    limit = request.args.get('limit', 100, type=int)
+    scope = request.args.get('scope', 'hot')
+    
+    if not subreddit_name:
+        return jsonify({'error': 'Subreddit name is required'}), 400
+    if not query.strip():
+        return jsonify({'error': 'Search query is required'}), 400
+    
+    try:
+        posts, source = search_subreddit_posts(subreddit_name, query, limit, scope)
+        return jsonify({
+            'subreddit': subreddit_name,
+            'query': query,
+            'scope': scope,
+            'source': source,
+            'posts': [
+                {key: value for key, value in post.items() if key != 'comments'}
+                for post in posts
+            ]
+        })
+    except ValueError as e:
+        return jsonify({'error': f"Invalid search query: {e}"}), 400
+    except Exception as e:
+        logger.error(f"Error searching subreddit posts: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/compare', methods=['GET'])
+def compare():
+    limit = request.args.get('limit', 50, type=int)
+    
+    try:
+        subreddit_names = parse_subreddit_names(request.args.get('names', ''))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    try:
+        comparison = compare_subreddits(subreddit_names, limit)
+        return jsonify(comparison)
+    except Exception as e:
+        logger.error(f"Error comparing subreddits: {e}")
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/comment/thread', methods=['GET'])
 def comment_thread():
     post_id = request.args.get('post_id')
@@ -0,0 +1,125 @@
+from datetime import datetime
+
+import pytest
+
+from utils import compare
+from utils.compare import _contributor_overlap, _frequency_series, compare_subreddits, parse_subreddit_names
+
+
+def make_post(post_id, author, when, stickied=False, title='A post'):
+    return {
+        'id': post_id,
+        'title': title,
+        'selftext': '',
+        'author': author,
+        'created_utc': datetime(*when).timestamp(),
+        'score': 0,
+        'num_comments': 0,
+        'permalink': '',
+        'stickied': stickied,
+        'comments': []
+    }
+
+
+def test_parse_subreddit_names():
+    assert parse_subreddit_names(' python, r/Django,,PYTHON ') == ['python', 'Django']
+    with pytest.raises(ValueError):
+        parse_subreddit_names(' , ')
+    with pytest.raises(ValueError):
+        parse_subreddit_names(','.join(f'sub{i}' for i in range(compare.MAX_COMPARE_SUBREDDITS + 1)))
+
+
+def test_frequency_series_aligns_subreddits_on_one_axis():
+    series = _frequency_series({
+        'a': [make_post('1', 'x', (2024, 5, 1, 10, 15)), make_post('2', 'x', (2024, 5, 1, 12, 5))],
+        'b': [make_post('3', 'y', (2024, 5, 1, 12, 40))],
+    })
+    assert series['labels'] == ['2024-05-01 10:00', '2024-05-01 11:00', '2024-05-01 12:00']
+    assert series['datasets'] == [
+        {'subreddit': 'a', 'data': [1, 0, 1]},
+        {'subreddit': 'b', 'data': [0, 0, 1]},
+    ]
+
+
+def test_frequency_series_ignores_old_stickied_posts():
+    series = _frequency_series({
+        'a': [
+            make_post('old', 'mod', (2015, 1, 1), stickied=True),
+            make_post('1', 'x', (2024, 5, 1, 10)),
+            make_post('2', 'x', (2024, 5, 1, 11)),
+        ],
+    })
+    assert series['labels'] == ['2024-05-01 10:00', '2024-05-01 11:00']
+    assert series['datasets'][0]['data'] == [1, 1]
+
+
+def test_frequency_series_clips_span():
+    series = _frequency_series({
+        'a': [
+            make_post('old', 'x', (2015, 1, 1)),
+            make_post('1', 'x', (2024, 5, 1, 12)),
+            make_post('2', 'x', (2024, 5, 31)),
+        ],
+    })
+    assert series['labels'][0] == '2024-05-01'
+    assert series['labels'][-1] == '2024-05-31'
+    assert len(series['labels']) == 31
+    assert sum(series['datasets'][0]['data']) == 2
+
+
+def test_frequency_series_empty():
+    assert _frequency_series({'a': []}) == {'labels': [], 'datasets': []}
+
+
+def test_contributor_overlap():
+    when = (2024, 5, 1)
+    overlap = _contributor_overlap({
+        'a': [make_post('1', 'alice', when), make_post('2', 'alice', when), make_post('3', 'bob', when)],
+        'b': [make_post('4', 'alice', when), make_post('5', 'carol', when), make_post('6', '[deleted]', when)],
+        'c': [make_post('7', 'bob', when), make_post('8', 'alice', when)],
+    })
+    assert overlap['top']['a'] == [{'username': 'alice', 'posts': 2}, {'username': 'bob', 'posts': 1}]
+    assert overlap['shared'] == [
+        {'username': 'alice', 'subreddits': ['a', 'b', 'c'], 'posts': 4},
+        {'username': 'bob', 'subreddits': ['a', 'c'], 'posts': 2},
+    ]
+    assert overlap['pairwise'] == {
+        'labels': ['a', 'b', 'c'],
+        'data': [[2, 1, 2], [1, 2, 1], [2, 1, 2]],
+    }
+
+
+def test_compare_subreddits_keeps_order_and_reports_errors(monkeypatch):
+    listings = {
+        'happy': [make_post('1', 'x', (2024, 5, 1), title='What a wonderful, great day')],
+        'sad': [make_post('2', 'y', (2024, 5, 1), title='A terrible, awful day')],
+    }
+
+    def load_hot_posts(name, limit):
+        if name not in listings:
+            raise Exception('not found')
+        return listings[name]
+
+    monkeypatch.setattr(compare, '_load_hot_posts', load_hot_posts)
+    result = compare_subreddits(['sad', 'missing', 'happy'])
+
+    assert result['subreddits'] == ['sad', 'happy']
+    assert list(result['errors']) == ['missing']
+    sad, happy = result['sentiment']['datasets']
+    assert sad['counts'] == [0, 0, 1]
+    assert happy['counts'] == [1, 0, 0]
+    assert happy['data'] == [100, 0, 0]
+
+
+def test_compare_subreddits_all_failed(monkeypatch):
+    def load_hot_posts(name, limit):
+        raise Exception('not found')
+
+    monkeypatch.setattr(compare, '_load_hot_posts', load_hot_posts)
+    with pytest.raises(Exception, match='any of the requested subreddits'):
+        compare_subreddits(['a', 'b'])
+
+
+def test_compare_subreddits_requires_names():
+    with pytest.raises(ValueError, match='At least one subreddit'):
+        compare_subreddits([])
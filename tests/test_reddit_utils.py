@@ -0,0 +1,64 @@
+from types import SimpleNamespace
+
+import pytest
+
+from utils import reddit_utils
+from utils.reddit_utils import fetch_hot_posts, search_subreddit_posts
+from utils.search_index import SearchIndex
+
+
+class FakeSubreddit:
+    def __init__(self, submissions):
+        self.submissions = submissions
+        self.hot_calls = 0
+
+    def hot(self, limit):
+        self.hot_calls += 1
+        return iter(self.submissions[:limit])
+
+
+def make_submission(post_id, title):
+    return SimpleNamespace(
+        id=post_id, title=title, is_self=True, selftext='', author=SimpleNamespace(name='someone'),
+        created_utc=0, score=0, num_comments=0, permalink='', stickied=False
+    )
+
+
+@pytest.fixture
+def index(monkeypatch):
+    index = SearchIndex()
+    monkeypatch.setattr(reddit_utils, 'get_search_index', lambda: index)
+    return index
+
+
+@pytest.fixture
+def subreddit(monkeypatch):
+    subreddit = FakeSubreddit([
+        make_submission(str(i), 'a game thread' if i % 3 == 0 else 'something else')
+        for i in range(30)
+    ])
+    client = SimpleNamespace(subreddit=lambda name: subreddit)
+    monkeypatch.setattr(reddit_utils, 'get_reddit_client', lambda: client)
+    return subreddit
+
+
+def test_small_subreddit_is_served_from_index(index, subreddit):
+    posts, source = search_subreddit_posts('small', 'game', 100)
+    assert (len(posts), source) == (10, 'listing')
+
+    posts, source = search_subreddit_posts('small', 'game', 100)
+    assert (len(posts), source) == (10, 'index')
+    assert subreddit.hot_calls == 1
+
+
+def test_partially_indexed_listing_is_not_coverage(index, subreddit, monkeypatch):
+    add_post = index.add_post
+
+    def flaky_add_post(subreddit_name, post, comments=None):
+        if post['id'] == '5':
+            raise Exception('boom')
+        return add_post(subreddit_name, post, comments)
+
+    monkeypatch.setattr(index, 'add_post', flaky_add_post)
+    assert len(fetch_hot_posts('small', 100)) == 29
+    assert index.listing_window('small', 'hot', 10) is None
@@ -0,0 +1,147 @@
+import pytest
+
+from utils import search_index
+from utils.search_index import POST_FIELDS, SearchIndex, parse_query
+
+
+def make_post(post_id, title, selftext='', created_utc=0):
+    return {
+        'id': post_id,
+        'title': title,
+        'selftext': selftext,
+        'author': 'someone',
+        'created_utc': created_utc,
+        'score': 0,
+        'num_comments': 0,
+        'permalink': '',
+        'comments': []
+    }
+
+
+@pytest.fixture
+def index():
+    index = SearchIndex()
+    index.add_post('python', make_post('a', 'Machine learning is great', created_utc=1))
+    index.add_post('python', make_post('b', 'Learning machine code', 'a deep dive', created_utc=2))
+    index.add_post('python', make_post('c', 'Rock & roll forever', created_utc=3),
+                   comments=['I love machine learning', 'bye'])
+    return index
+
+
+def ids(posts):
+    return sorted(post['id'] for post in posts)
+
+
+def test_parse_query_plain_keyword_is_phrase():
+    assert parse_query('game') == ('term', 'game')
+    assert parse_query('Cats and Dogs') == ('phrase', ['cats', 'and', 'dogs'])
+    assert parse_query('rock & roll') == ('phrase', ['rock', 'roll'])
+
+
+def test_parse_query_operators():
+    assert parse_query('"machine learning" OR (deep AND NOT foo)') == (
+        'or',
+        ('phrase', ['machine', 'learning']),
+        ('and', ('term', 'deep'), ('not', ('term', 'foo')))
+    )
+    assert parse_query('rock & NOT roll') == ('and', ('term', 'rock'), ('not', ('term', 'roll')))
+
+
+def test_parse_query_bare_run_is_always_phrase():
+    assert parse_query('python django OR flask') == (
+        'or', ('phrase', ['python', 'django']), ('term', 'flask')
+    )
+    assert parse_query('NOT job posting') == ('not', ('phrase', ['job', 'posting']))
+    assert parse_query('"web app" python') == ('and', ('phrase', ['web', 'app']), ('term', 'python'))
+
+
+@pytest.mark.parametrize('query', ['', '   ', '&', 'a OR', '()', 'AND', '(a', 'a )', 'NOT -'])
+def test_parse_query_rejects_malformed(query):
+    with pytest.raises(ValueError):
+        parse_query(query)
+
+
+@pytest.mark.parametrize('query, expected', [
+    ('machine learning', ['a', 'c']),
+    ('"learning machine"', ['b']),
+    ('machine AND learning', ['a', 'b', 'c']),
+    ('machine learning OR deep', ['a', 'b', 'c']),
+    ('learning machine OR nothing', ['b']),
+    ('learning NOT great', ['b', 'c']),
+    ('deep OR forever', ['b', 'c']),
+    ('rock & roll', ['c']),
+    ('MACHINE', ['a', 'b', 'c']),
+    ('learn', []),
+])
+def test_search(index, query, expected):
+    assert ids(index.search(query, 'python')) == expected
+
+
+def test_search_restricted_to_post_fields(index):
+    assert ids(index.search('love', 'python')) == ['c']
+    assert index.search('love', 'python', fields=POST_FIELDS) == []
+    assert ids(index.search('machine learning', 'python', fields=POST_FIELDS)) == ['a']
+    assert ids(index.search('NOT love', 'python', fields=POST_FIELDS)) == ['a', 'b', 'c']
+
+
+def test_phrase_does_not_span_comments(index):
+    assert index.search('"learning bye"', 'python') == []
+
+
+def test_search_respects_window_order_and_subreddit(index):
+    index.add_post('other', make_post('z', 'machine learning elsewhere'))
+    results = index.search('machine', 'Python', post_ids=['c', 'a'])
+    assert [post['id'] for post in results] == ['c', 'a']
+    assert ids(index.search('machine')) == ['a', 'b', 'c', 'z']
+
+
+def test_reindex_keeps_comments_and_drops_stale_terms(index):
+    index.add_post('python', make_post('c', 'Jazz forever'))
+    assert index.search('love', 'python')[0]['id'] == 'c'
+    assert index.search('rock', 'python') == []
+
+
+def test_listing_window_coverage(index, monkeypatch):
+    monkeypatch.setattr(search_index.time, 'time', lambda: 1000)
+    index.record_listing('python', 'hot', ['a', 'b', 'c'])
+    assert index.listing_window('PYTHON', 'hot', 2) == ['a', 'b']
+    assert index.listing_window('python', 'hot', 4) is None
+    assert index.listing_window('python', 'top', 2) is None
+
+    monkeypatch.setattr(search_index.time, 'time', lambda: 1000 + index.ttl)
+    assert index.listing_window('python', 'hot', 2) is None
+
+
+def test_newest_listing_wins(index):
+    index.record_listing('python', 'hot', ['a', 'b', 'c'], limit=3)
+    index.record_listing('python', 'hot', ['c', 'a'], limit=2)
+    assert index.listing_window('python', 'hot', 2) == ['c', 'a']
+    assert index.listing_window('python', 'hot', 3) is None
+
+
+def test_exhausted_listing_covers_larger_windows(index):
+    # Asked for 100, the subreddit only had three hot posts
+    index.record_listing('python', 'hot', ['a', 'b', 'c'], limit=100)
+    assert index.listing_window('python', 'hot', 100) == ['a', 'b', 'c']
+    assert index.listing_window('python', 'hot', 500) == ['a', 'b', 'c']
+
+
+def test_listing_window_lost_to_post_eviction():
+    index = SearchIndex(max_posts=2)
+    for post_id in 'abc':
+        index.add_post('python', make_post(post_id, 'title'))
+    index.record_listing('python', 'hot', ['a', 'b', 'c'])
+    assert index.listing_window('python', 'hot', 3) is None
+    assert index.listing_window('python', 'hot', 1) is None
+    assert index.get_post('python', 'c') is not None
+
+
+def test_least_recently_used_subreddit_is_evicted():
+    index = SearchIndex(max_subreddits=2)
+    for name in ('a', 'b'):
+        index.add_post(name, make_post('1', 'title'))
+    index.search('title', 'a')
+    index.add_post('c', make_post('1', 'title'))
+    assert index.get_post('a', '1') is not None
+    assert index.get_post('b', '1') is None
+    assert index.get_post('c', '1') is not None
@@ -0,0 +1,214 @@
+import logging
+from datetime import datetime, timedelta
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from utils.reddit_utils import fetch_hot_posts, MAX_CONCURRENT_FETCHES
+from utils.search_index import get_search_index
+from utils.sentiment import score_post
+
+# Set up logging
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+MAX_COMPARE_SUBREDDITS = 20
+# Frequency axis never reaches further back than this from the newest post
+MAX_FREQUENCY_SPAN = timedelta(days=30)
+
+
+def parse_subreddit_names(names):
+    """Split a comma separated list of subreddits, dropping duplicates"""
+    seen = set()
+    result = []
+    for name in (names or '').split(','):
+        name = name.strip()
+        if name.lower().startswith('r/'):
+            name = name[2:]
+        if name and name.lower() not in seen:
+            seen.add(name.lower())
+            result.append(name)
+
+    if not result:
+        raise ValueError("At least one subreddit name is required")
+    if len(result) > MAX_COMPARE_SUBREDDITS:
+        raise ValueError(f"At most {MAX_COMPARE_SUBREDDITS} subreddits can be compared at once")
+    return result
+
+
+def _load_hot_posts(subreddit_name, limit):
+    """Get hot posts from the search index, fetching only on a miss"""
+    posts = get_search_index().listing_posts(subreddit_name, 'hot', limit)
+    if posts is not None:
+        return posts
+    return fetch_hot_posts(subreddit_name, limit)
+
+
+def _score_posts(posts):
+    """Sentiment counts and mean polarity for one subreddit's posts"""
+    counts = {"positive": 0, "neutral": 0, "negative": 0}
+    total_polarity = 0
+    for post in posts:
+        polarity, sentiment = score_post(post)
+        counts[sentiment] += 1
+        total_polarity += polarity
+    return counts, total_polarity / len(posts) if posts else 0
+
+
+def _frequency_series(posts_by_subreddit):
+    """Bucket post times for every subreddit onto one shared time axis.
+
+    Stickied posts are left out, since hot listings often pin very old
+    ones, and the axis is clipped to MAX_FREQUENCY_SPAN before the
+    newest post.
+    """
+    times = {
+        name: [
+            datetime.fromtimestamp(post['created_utc'])
+            for post in posts
+            if post.get('created_utc') and not post.get('stickied')
+        ]
+        for name, posts in posts_by_subreddit.items()
+    }
+    all_times = [t for subreddit_times in times.values() for t in subreddit_times]
+    if not all_times:
+        return {'labels': [], 'datasets': []}
+
+    max_time = max(all_times)
+    cutoff = max_time - MAX_FREQUENCY_SPAN
+    times = {
+        name: [t for t in subreddit_times if t >= cutoff]
+        for name, subreddit_times in times.items()
+    }
+    min_time = min(t for subreddit_times in times.values() for t in subreddit_times)
+
+    # Hourly buckets for up to a week of posts, daily beyond that
+    if max_time - min_time <= timedelta(days=7):
+        interval = timedelta(hours=1)
+        format_str = '%Y-%m-%d %H:00'
+    else:
+        interval = timedelta(days=1)
+        format_str = '%Y-%m-%d'
+
+    labels = []
+    current_time = min_time
+    while current_time.strftime(format_str) <= max_time.strftime(format_str):
+        labels.append(current_time.strftime(format_str))
+        current_time += interval
+    positions = {label: i for i, label in enumerate(labels)}
+
+    datasets = []
+    for name, subreddit_times in times.items():
+        data = [0] * len(labels)
+        for post_time in subreddit_times:
+            data[positions[post_time.strftime(format_str)]] += 1
+        datasets.append({'subreddit': name, 'data': data})
+
+    return {'labels': labels, 'datasets': datasets}
+
+
+def _contributor_overlap(posts_by_subreddit, top_n=10):
+    """Top contributors per subreddit and the authors they share"""
+    counters = {
+        name: Counter(post['author'] for post in posts if post['author'] != '[deleted]')
+        for name, posts in posts_by_subreddit.items()
+    }
+    names = list(counters)
+
+    top = {
+        name: [{"username": author, "posts": count} for author, count in counter.most_common(top_n)]
+        for name, counter in counters.items()
+    }
+
+    shared = []
+    all_authors = set().union(*(counter.keys() for counter in counters.values()))
+    for author in all_authors:
+        subreddits = [name for name in names if author in counters[name]]
+        if len(subreddits) > 1:
+            shared.append({
+                "username": author,
+                "subreddits": subreddits,
+                "posts": sum(counters[name][author] for name in subreddits)
+            })
+    shared.sort(key=lambda item: (-len(item['subreddits']), -item['posts'], item['username']))
+
+    # Number of authors each pair of subreddits has in common
+    pairwise = [
+        [len(counters[a].keys() & counters[b].keys()) for b in names]
+        for a in names
+    ]
+
+    return {
+        "top": top,
+        "shared": shared[:50],
+        "pairwise": {"labels": names, "data": pairwise}
+    }
+
+
+def compare_subreddits(subreddit_names, limit=50):
+    """Compare sentiment, posting activity and contributors across subreddits.
+
+    Hot listings are fetched concurrently (or served from the search
+    index), within the shared upstream fetch budget. Each listing is
+    scored as soon as it arrives, so sentiment scoring overlaps the
+    fetches that are still in flight. Raises ValueError when no
+    subreddits are given.
+    """
+    if not subreddit_names:
+        raise ValueError("At least one subreddit name is required")
+    limit = min(max(1, limit), 100)
+
+    posts_by_subreddit = {}
+    sentiment_counts = {}
+    mean_polarity = {}
+    errors = {}
+
+    workers = min(len(subreddit_names), MAX_CONCURRENT_FETCHES)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(_load_hot_posts, name, limit): name
+            for name in subreddit_names
+        }
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                posts = future.result()
+            except Exception as e:
+                logger.error(f"Error fetching posts for comparison from r/{name}: {e}")
+                errors[name] = f"Could not access r/{name}. The subreddit may be private, quarantined, or doesn't exist."
+                continue
+            posts_by_subreddit[name] = posts
+            sentiment_counts[name], mean_polarity[name] = _score_posts(posts)
+
+    if not posts_by_subreddit:
+        raise Exception("Could not retrieve posts for any of the requested subreddits")
+
+    # Keep the order the subreddits were requested in
+    posts_by_subreddit = {name: posts_by_subreddit[name] for name in subreddit_names if name in posts_by_subreddit}
+    errors = {name: errors[name] for name in subreddit_names if name in errors}
+
+    names = list(posts_by_subreddit)
+    datasets = []
+    for name in names:
+        counts = sentiment_counts[name]
+        total = sum(counts.values())
+        datasets.append({
+            "subreddit": name,
+            "posts_analyzed": total,
+            "counts": [counts["positive"], counts["neutral"], counts["negative"]],
+            "data": [
+                (counts[key] / total) * 100 if total else 0
+                for key in ("positive", "neutral", "negative")
+            ],
+            "mean_polarity": mean_polarity[name]
+        })
+
+    return {
+        "subreddits": names,
+        "errors": errors,
+        "sentiment": {
+            "labels": ["Positive", "Neutral", "Negative"],
+            "colors": ["#28a745", "#6c757d", "#dc3545"],
+            "datasets": datasets
+        },
+        "frequency": _frequency_series(posts_by_subreddit),
+        "contributors": _contributor_overlap(posts_by_subreddit)
+    }
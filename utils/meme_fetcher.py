@@ -1,5 +1,5 @@
 import logging
-from utils.reddit_utils import get_reddit_client
+from utils.reddit_utils import get_reddit_client, upstream_budget
 
 # Set up logging
 logging.basicConfig(level=logging.DEBUG)
@@ -45,7 +45,8 @@ def get_memes(subreddit_name="memes", limit=10):
         
         try:
             # Try to get hot posts with extra error handling
-            submissions = subreddit.hot(limit=max_posts_to_check)
+            with upstream_budget:
+                submissions = list(subreddit.hot(limit=max_posts_to_check))
             
             # Process each submission with error handling
             for submission in submissions:
@@ -1,14 +1,21 @@
 import os
 import logging
+import threading
 from datetime import datetime, timedelta
 from collections import Counter
 import praw
 from io import BytesIO
+from utils.search_index import get_search_index, parse_query, document_from_submission, FIELDS
 
 # Set up logging
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
+# Upstream Reddit fetches allowed in flight at once, shared by every request
+MAX_CONCURRENT_FETCHES = 8
+
+upstream_budget = threading.BoundedSemaphore(MAX_CONCURRENT_FETCHES)
+
 # Initialize Reddit API client
 def get_reddit_client():
     try:
@@ -60,9 +67,23 @@ def get_subreddit_info(subreddit_name):
         display_name = subreddit.display_name
         
         # Get top contributors (approximation based on hot posts)
+        index = get_search_index()
         top_contributors = Counter()
-        for submission in subreddit.hot(limit=50):
+        hot_ids = []
+        indexed_all = True
+        with upstream_budget:
+            submissions = list(subreddit.hot(limit=50))
+        for submission in submissions:
             top_contributors[submission.author.name if submission.author else '[deleted]'] += 1
+            # Index the listing we already paid for
+            try:
+                hot_ids.append(index.add_post(subreddit_name, document_from_submission(submission, subreddit_name))['id'])
+            except Exception as e:
+                logger.warning(f"Error indexing post in subreddit {subreddit_name}: {e}")
+                indexed_all = False
+        # Only a fully indexed listing counts as coverage
+        if indexed_all:
+            index.record_listing(subreddit_name, 'hot', hot_ids, limit=50)
         
         top_contributors = [
             {"username": author, "posts": count} 
@@ -95,8 +116,17 @@ def get_subreddit_posts(subreddit_name, limit=25, time_filter='week'):
         posts = []
         post_texts = []  # For wordcloud
         post_times = []  # For frequency chart
+        index = get_search_index()
         
-        for submission in subreddit.top(time_filter=time_filter, limit=limit):
+        with upstream_budget:
+            submissions = list(subreddit.top(time_filter=time_filter, limit=limit))
+        
+        for submission in submissions:
+            try:
+                index.add_post(subreddit_name, document_from_submission(submission, subreddit_name))
+            except Exception as e:
+                logger.warning(f"Error indexing post in subreddit {subreddit_name}: {e}")
+            
             # Basic post info
             post_data = {
                 'id': submission.id,
@@ -176,7 +206,8 @@ def get_comment_thread(post_id, limit=50):
     
     try:
         submission = reddit.submission(id=post_id)
-        submission.comments.replace_more(limit=0)  # Only fetch readily available comments
+        with upstream_budget:
+            submission.comments.replace_more(limit=0)  # Only fetch readily available comments
         
         # Basic post info
         post_data = {
@@ -227,6 +258,18 @@ def get_comment_thread(post_id, limit=50):
             if comment_data:
                 comments.append(comment_data)
         
+        # Index full comment bodies so keyword queries can match discussion
+        try:
+            subreddit_name = submission.subreddit.display_name
+            comment_bodies = [c.body for c in submission.comments.list() if getattr(c, 'body', None)]
+            get_search_index().add_post(
+                subreddit_name,
+                document_from_submission(submission, subreddit_name),
+                comments=comment_bodies
+            )
+        except Exception as e:
+            logger.warning(f"Could not index comments for post {post_id}: {e}")
+        
         return {
             'post': post_data,
             'comments': comments
@@ -234,4 +277,75 @@ def get_comment_thread(post_id, limit=50):
     
     except Exception as e:
         logger.error(f"Error getting comment thread: {e}")
-        raise Exception(f"Could not retrieve comments for post {post_id}")
\ No newline at end of file
+        raise Exception(f"Could not retrieve comments for post {post_id}")
+
+def fetch_hot_posts(subreddit_name, limit=100):
+    """Fetch a subreddit's hot listing and add it to the search index"""
+    reddit = get_reddit_client()
+    subreddit = reddit.subreddit(subreddit_name)
+    index = get_search_index()
+    
+    with upstream_budget:
+        submissions = list(subreddit.hot(limit=limit))
+    
+    posts = []
+    indexed_all = True
+    for submission in submissions:
+        try:
+            posts.append(index.add_post(subreddit_name, document_from_submission(submission, subreddit_name)))
+        except Exception as e:
+            logger.warning(f"Error indexing post in subreddit {subreddit_name}: {e}")
+            indexed_all = False
+    
+    # Only a fully indexed listing counts as coverage
+    if indexed_all:
+        index.record_listing(subreddit_name, 'hot', [post['id'] for post in posts], limit=limit)
+    return posts
+
+def search_subreddit_posts(subreddit_name, query, limit=100, scope='hot', fields=FIELDS):
+    """Find posts in a subreddit matching a keyword query.
+
+    With scope 'hot' (the default) only the first ``limit`` hot posts are
+    searched: the query is answered from the local search index when it
+    covers that window, otherwise the hot listing is fetched, indexed and
+    filtered locally, so both paths see the same posts.
+
+    With scope 'all' Reddit's search endpoint is queried across all time
+    instead, and its results are indexed and re-checked locally.
+
+    ``fields`` limits which indexed fields the query is matched against.
+    Comments are only indexed for threads someone has opened, so pass
+    POST_FIELDS when the result must not depend on that.
+
+    Returns a (posts, source) tuple where source is 'index', 'listing'
+    or 'search'. Raises ValueError for a malformed query or unknown scope.
+    """
+    tree = parse_query(query)
+    index = get_search_index()
+    
+    if scope == 'hot':
+        window = index.listing_window(subreddit_name, 'hot', limit)
+        if window is not None:
+            return index.search(tree, subreddit_name, post_ids=window, fields=fields), 'index'
+        
+        posts = fetch_hot_posts(subreddit_name, limit)
+        return index.search(tree, subreddit_name, post_ids=[post['id'] for post in posts], fields=fields), 'listing'
+    
+    if scope != 'all':
+        raise ValueError(f"Unknown search scope '{scope}'")
+    
+    reddit = get_reddit_client()
+    subreddit = reddit.subreddit(subreddit_name)
+    
+    with upstream_budget:
+        submissions = list(subreddit.search(query, sort='relevance', time_filter='all', limit=limit))
+    
+    post_ids = []
+    for submission in submissions:
+        try:
+            post_ids.append(index.add_post(subreddit_name, document_from_submission(submission, subreddit_name))['id'])
+        except Exception as e:
+            logger.warning(f"Error indexing search result in subreddit {subreddit_name}: {e}")
+    
+    # Reddit's search is looser than ours, so re-check results locally
+    return index.search(tree, subreddit_name, post_ids=post_ids, fields=fields), 'search'
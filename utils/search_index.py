@@ -0,0 +1,376 @@
+import re
+import time
+import logging
+import threading
+from collections import OrderedDict
+
+# Set up logging
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+# How long a fetched listing is trusted to describe the subreddit
+INDEX_TTL_SECONDS = 15 * 60
+# Oldest-indexed posts are evicted past this many per subreddit
+MAX_POSTS_PER_SUBREDDIT = 2000
+# Least recently used subreddits are dropped past this many
+MAX_SUBREDDITS = 50
+# Comment bodies kept per post; later ones are not indexed
+MAX_COMMENTS_PER_POST = 200
+
+FIELDS = ('title', 'selftext', 'comments')
+# Fields every indexed post has; comments only exist for opened threads
+POST_FIELDS = ('title', 'selftext')
+
+_WORD_RE = re.compile(r"\w+")
+_QUERY_TOKEN_RE = re.compile(r'"[^"]*"?|\(|\)|[^\s()"]+')
+
+
+def tokenize(text):
+    """Split text into lowercase word tokens"""
+    if not text:
+        return []
+    return _WORD_RE.findall(text.lower())
+
+
+def _combine(op, left, right):
+    """Join two query nodes, skipping sides that had no searchable words"""
+    if left is None:
+        return right
+    if right is None:
+        return left
+    return (op, left, right)
+
+
+def parse_query(query):
+    """Parse a keyword query into a tree of nested tuples.
+
+    Matching is on whole words, case-insensitively: ``game`` does not
+    match "games". A run of bare words is always matched as a phrase, so
+    ``cats and dogs`` and ``python django OR flask`` keep their words
+    together. Phrases, "quoted phrases" and parenthesised groups combine
+    with AND / OR / NOT (uppercase); placing two of them side by side,
+    as in ``"web app" python``, ANDs them. Tokens with no word characters
+    (``&``, ``-``) are ignored. Raises ValueError for malformed queries.
+    """
+    tokens = _QUERY_TOKEN_RE.findall(query or '')
+    if not tokens:
+        raise ValueError("Query is empty")
+    pos = 0
+
+    def is_bare(token):
+        return token is not None and token not in ('AND', 'OR', 'NOT', '(', ')') and not token.startswith('"')
+
+    def peek():
+        return tokens[pos] if pos < len(tokens) else None
+
+    def advance():
+        nonlocal pos
+        pos += 1
+        return tokens[pos - 1]
+
+    def parse_or():
+        node = parse_and()
+        while peek() == 'OR':
+            advance()
+            node = _combine('or', node, parse_and())
+        return node
+
+    def parse_and():
+        node = parse_not()
+        while peek() is not None and peek() not in ('OR', ')'):
+            if peek() == 'AND':
+                advance()
+            node = _combine('and', node, parse_not())
+        return node
+
+    def parse_not():
+        if peek() == 'NOT':
+            advance()
+            node = parse_not()
+            return ('not', node) if node is not None else None
+        return parse_atom()
+
+    def parse_atom():
+        token = peek()
+        if token is None or token in ('AND', 'OR', ')'):
+            raise ValueError(f"Unexpected {token or 'end of query'!r}")
+        advance()
+        if token == '(':
+            node = parse_or()
+            if peek() != ')':
+                raise ValueError("Missing closing parenthesis")
+            advance()
+            return node
+        if token.startswith('"'):
+            words = tokenize(token.strip('"'))
+        else:
+            # Gather the whole run of bare words into one phrase
+            words = tokenize(token)
+            while is_bare(peek()):
+                words.extend(tokenize(advance()))
+        if not words:
+            return None
+        return ('phrase', words) if len(words) > 1 else ('term', words[0])
+
+    tree = parse_or()
+    if peek() is not None:
+        raise ValueError(f"Unexpected {peek()!r}")
+    if tree is None:
+        raise ValueError("Query has no searchable words")
+    return tree
+
+
+def document_from_submission(submission, subreddit_name=None):
+    """Build an indexable post document from a PRAW submission"""
+    try:
+        author_name = submission.author.name if hasattr(submission, 'author') and submission.author else "[deleted]"
+    except:
+        author_name = "[deleted]"
+
+    selftext = ""
+    try:
+        if hasattr(submission, 'is_self') and submission.is_self and hasattr(submission, 'selftext'):
+            selftext = submission.selftext or ""
+    except:
+        selftext = ""
+
+    return {
+        "id": getattr(submission, 'id', 'unknown'),
+        "subreddit": subreddit_name,
+        "title": getattr(submission, 'title', '') or "",
+        "selftext": selftext,
+        "author": author_name,
+        "created_utc": getattr(submission, 'created_utc', 0),
+        "score": getattr(submission, 'score', 0),
+        "num_comments": getattr(submission, 'num_comments', 0),
+        "permalink": getattr(submission, 'permalink', ''),
+        "stickied": bool(getattr(submission, 'stickied', False)),
+        "comments": []
+    }
+
+
+class _SubredditIndex:
+    """Postings, stored posts and listing coverage for one subreddit"""
+
+    def __init__(self):
+        self.posts = OrderedDict()
+        # term -> {post_id: {field: [positions]}}
+        self.postings = {}
+        self.post_terms = {}
+        # listing name -> (fetched_at, [post_ids], exhausted)
+        self.listings = {}
+
+    def remove(self, post_id):
+        for term in self.post_terms.pop(post_id, ()):
+            entries = self.postings.get(term)
+            if entries is not None:
+                entries.pop(post_id, None)
+                if not entries:
+                    del self.postings[term]
+        return self.posts.pop(post_id, None)
+
+    def add(self, post):
+        post_id = post['id']
+        terms = set()
+        for field in FIELDS:
+            value = post.get(field)
+            texts = value if isinstance(value, list) else [value]
+            offset = 0
+            for text in texts:
+                words = tokenize(text)
+                for i, word in enumerate(words):
+                    field_positions = self.postings.setdefault(word, {}).setdefault(post_id, {})
+                    field_positions.setdefault(field, []).append(offset + i)
+                    terms.add(word)
+                # Gap keeps phrases from matching across separate comments
+                offset += len(words) + 1
+        self.post_terms[post_id] = terms
+        self.posts[post_id] = post
+
+    def term_ids(self, term, fields=FIELDS):
+        return {
+            post_id
+            for post_id, field_positions in self.postings.get(term, {}).items()
+            if any(field in field_positions for field in fields)
+        }
+
+    def phrase_ids(self, words, fields=FIELDS):
+        if not words:
+            return set()
+        if len(words) == 1:
+            return self.term_ids(words[0], fields)
+        candidates = set.intersection(*(self.term_ids(w, fields) for w in words))
+        matches = set()
+        for post_id in candidates:
+            first = self.postings[words[0]][post_id]
+            for field, starts in first.items():
+                if field not in fields:
+                    continue
+                rest = [set(self.postings[w][post_id].get(field, ())) for w in words[1:]]
+                if any(all(s + i + 1 in positions for i, positions in enumerate(rest)) for s in starts):
+                    matches.add(post_id)
+                    break
+        return matches
+
+    def evaluate(self, node, universe, fields=FIELDS):
+        kind = node[0]
+        if kind == 'term':
+            return self.term_ids(node[1], fields) & universe
+        if kind == 'phrase':
+            return self.phrase_ids(node[1], fields) & universe
+        if kind == 'and':
+            return self.evaluate(node[1], universe, fields) & self.evaluate(node[2], universe, fields)
+        if kind == 'or':
+            return self.evaluate(node[1], universe, fields) | self.evaluate(node[2], universe, fields)
+        if kind == 'not':
+            return universe - self.evaluate(node[1], universe, fields)
+        raise ValueError(f"Unknown query node {kind!r}")
+
+
+class SearchIndex:
+    """Incrementally maintained inverted index over fetched Reddit posts.
+
+    Titles, selftext and comment bodies are indexed per subreddit with
+    token positions, so boolean and phrase queries can be answered
+    locally. Fetched listings are recorded so callers can tell whether
+    the index already covers a window of posts. Memory is bounded by
+    capping posts per subreddit, comments per post and the number of
+    subreddits, evicting the least recently used subreddit first.
+    """
+
+    def __init__(self, ttl=INDEX_TTL_SECONDS, max_posts=MAX_POSTS_PER_SUBREDDIT,
+                 max_subreddits=MAX_SUBREDDITS):
+        self.ttl = ttl
+        self.max_posts = max_posts
+        self.max_subreddits = max_subreddits
+        self._lock = threading.RLock()
+        self._subreddits = OrderedDict()
+
+    def _subreddit(self, subreddit_name, create=False):
+        key = (subreddit_name or '').lower()
+        sub_index = self._subreddits.get(key)
+        if sub_index is not None:
+            self._subreddits.move_to_end(key)
+        elif create:
+            sub_index = self._subreddits[key] = _SubredditIndex()
+            while len(self._subreddits) > self.max_subreddits:
+                evicted, _ = self._subreddits.popitem(last=False)
+                logger.debug(f"Evicted r/{evicted} from the search index")
+        return sub_index
+
+    def add_post(self, subreddit_name, post, comments=None):
+        """Index a post document, replacing any earlier version of it.
+
+        Comments already indexed for the post are kept unless new ones
+        are given. Returns the stored document.
+        """
+        with self._lock:
+            sub_index = self._subreddit(subreddit_name, create=True)
+            post = dict(post, subreddit=post.get('subreddit') or subreddit_name)
+            previous = sub_index.remove(post['id'])
+            if comments is not None:
+                post['comments'] = list(comments)[:MAX_COMMENTS_PER_POST]
+            elif previous is not None:
+                post['comments'] = previous.get('comments', [])
+            if previous is not None and previous['title'] == post['title'] and previous['selftext'] == post['selftext']:
+                # Text unchanged, so cached sentiment is still valid
+                for key in ('polarity', 'sentiment'):
+                    if key in previous:
+                        post[key] = previous[key]
+            sub_index.add(post)
+
+            while len(sub_index.posts) > self.max_posts:
+                sub_index.remove(next(iter(sub_index.posts)))
+            return post
+
+    def record_listing(self, subreddit_name, listing, post_ids, limit=None):
+        """Remember that a listing returned these posts just now.
+
+        The newest fetch always replaces an older one, so a window is never
+        served in a stale order. ``limit`` is how many posts were asked
+        for; a listing that came back shorter has no more posts and
+        covers any window.
+        """
+        with self._lock:
+            sub_index = self._subreddit(subreddit_name, create=True)
+            exhausted = limit is not None and len(post_ids) < limit
+            sub_index.listings[listing] = (time.time(), list(post_ids), exhausted)
+
+    def listing_window(self, subreddit_name, listing, limit):
+        """Return the first ``limit`` post ids of a listing, or None.
+
+        None means the index does not cover the window: the listing was
+        never fetched, has expired, is shorter than ``limit`` without
+        having run out of posts, or lost posts to eviction.
+        """
+        with self._lock:
+            sub_index = self._subreddit(subreddit_name)
+            if sub_index is None or listing not in sub_index.listings:
+                return None
+            fetched_at, post_ids, exhausted = sub_index.listings[listing]
+            if time.time() - fetched_at >= self.ttl:
+                return None
+            if len(post_ids) < limit and not exhausted:
+                return None
+            window = post_ids[:limit]
+            if any(post_id not in sub_index.posts for post_id in window):
+                return None
+            return window
+
+    def listing_posts(self, subreddit_name, listing, limit):
+        """Return the documents in a covered listing window, or None"""
+        with self._lock:
+            window = self.listing_window(subreddit_name, listing, limit)
+            if window is None:
+                return None
+            sub_index = self._subreddit(subreddit_name)
+            return [sub_index.posts[post_id] for post_id in window]
+
+    def search(self, query, subreddit_name=None, post_ids=None, fields=FIELDS):
+        """Return indexed posts matching ``query``.
+
+        ``query`` is a query string or a tree from parse_query. Results
+        keep the order of ``post_ids`` when given, otherwise newest first.
+        Without ``subreddit_name`` every indexed subreddit is searched.
+        Only the given ``fields`` are matched against.
+        """
+        tree = parse_query(query) if isinstance(query, str) else query
+        with self._lock:
+            if subreddit_name is not None:
+                sub_index = self._subreddit(subreddit_name)
+                sub_indexes = [sub_index] if sub_index is not None else []
+            else:
+                sub_indexes = list(self._subreddits.values())
+
+            results = []
+            for sub_index in sub_indexes:
+                if post_ids is not None:
+                    universe = set(post_ids) & set(sub_index.posts)
+                else:
+                    universe = set(sub_index.posts)
+                matches = sub_index.evaluate(tree, universe, fields)
+                results.extend(sub_index.posts[post_id] for post_id in matches)
+
+        if post_ids is not None:
+            order = {post_id: i for i, post_id in enumerate(post_ids)}
+            results.sort(key=lambda post: order[post['id']])
+        else:
+            results.sort(key=lambda post: post.get('created_utc') or 0, reverse=True)
+        return results
+
+    def get_post(self, subreddit_name, post_id):
+        with self._lock:
+            sub_index = self._subreddit(subreddit_name)
+            return sub_index.posts.get(post_id) if sub_index else None
+
+    def clear(self):
+        with self._lock:
+            self._subreddits.clear()
+
+
+_search_index = SearchIndex()
+
+
+def get_search_index():
+    """Return the process-wide search index"""
+    return _search_index
@@ -1,6 +1,7 @@
 import logging
 from textblob import TextBlob
-from utils.reddit_utils import get_reddit_client
+from utils.reddit_utils import fetch_hot_posts, search_subreddit_posts
+from utils.search_index import parse_query, POST_FIELDS
 
 # Set up logging
 logging.basicConfig(level=logging.DEBUG)
@@ -39,31 +40,82 @@ def analyze_text_sentiment(text):
             "sentiment": "neutral"
         }
 
-def analyze_subreddit_sentiment(subreddit_name, keyword=None, limit=100):
-    """Analyze sentiment of posts in a subreddit, optionally filtered by keyword"""
-    reddit = get_reddit_client()
+def score_post(post):
+    """Score a post document by averaging title and body sentiment.
+
+    The result is cached on the document, so posts served from the
+    search index are only run through TextBlob once.
+    """
+    if "polarity" in post and "sentiment" in post:
+        return post["polarity"], post["sentiment"]
+    
+    title_text = post.get("title", "")
+    body_text = post.get("selftext", "")
     
     try:
-        subreddit = reddit.subreddit(subreddit_name)
+        title_sentiment = analyze_text_sentiment(title_text)
         
+        if body_text:
+            body_sentiment = analyze_text_sentiment(body_text)
+            # Average the sentiment for title and body
+            avg_polarity = (title_sentiment["polarity"] + body_sentiment["polarity"]) / 2
+            
+            if avg_polarity > 0.1:
+                sentiment = "positive"
+            elif avg_polarity < -0.1:
+                sentiment = "negative"
+            else:
+                sentiment = "neutral"
+        else:
+            avg_polarity = title_sentiment["polarity"]
+            sentiment = title_sentiment["sentiment"]
+    except Exception as e:
+        logger.error(f"Error analyzing sentiment for post {post.get('id')}: {e}")
+        # Default to neutral if sentiment analysis fails
+        return 0, "neutral"
+    
+    post["polarity"] = avg_polarity
+    post["sentiment"] = sentiment
+    return avg_polarity, sentiment
+
+def analyze_subreddit_sentiment(subreddit_name, keyword=None, limit=100):
+    """Analyze sentiment of posts in a subreddit, optionally filtered by keyword.
+
+    Keywords match whole words case-insensitively, so "game" does not
+    match "games"; a plain multi-word keyword is matched as a phrase.
+    Keyword queries also support AND / OR / NOT and "quoted phrases", and
+    are answered from the local search index when it covers the hot
+    listing. Only titles and selftext are matched, never indexed
+    comments, so the result doesn't depend on which threads were opened.
+    Raises ValueError for a malformed keyword query.
+    """
+    if keyword:
+        # Reject malformed queries up front so callers can report them as bad input
+        parse_query(keyword)
+    
+    try:
         # Collect posts
         posts_analyzed = 0
         sentiment_counts = {"positive": 0, "neutral": 0, "negative": 0}
         sentiment_scores = []
         keyword_matches = []
         
-        # Get hot posts from the subreddit with error handling
+        # Get hot posts (or keyword matches) with error handling
         try:
-            submissions = list(subreddit.hot(limit=limit))
+            if keyword:
+                posts, source = search_subreddit_posts(subreddit_name, keyword, limit, fields=POST_FIELDS)
+            else:
+                posts, source = fetch_hot_posts(subreddit_name, limit), "listing"
         except Exception as e:
             logger.error(f"Error fetching posts from subreddit {subreddit_name}: {e}")
             raise Exception(f"Could not access r/{subreddit_name}. The subreddit may be private, quarantined, or doesn't exist.")
         
-        if not submissions:
+        if not posts and not keyword:
             logger.warning(f"No posts found in subreddit {subreddit_name}")
             return {
                 "subreddit": subreddit_name,
-                "keyword": keyword if keyword else None,
+                "keyword": None,
+                "source": source,
                 "posts_analyzed": 0,
                 "sentiment_counts": {"positive": 0, "neutral": 0, "negative": 0},
                 "sentiment_percentages": {"positive": 0, "neutral": 0, "negative": 0},
@@ -76,65 +128,22 @@ def analyze_subreddit_sentiment(subreddit_name, keyword=None, limit=100):
                 "keyword_matches": []
             }
         
-        # Process each submission with robust error handling
-        for submission in submissions:
+        # Process each post with robust error handling
+        for post in posts:
             try:
-                title_text = submission.title if hasattr(submission, 'title') else ""
-                body_text = ""
-                try:
-                    if hasattr(submission, 'is_self') and submission.is_self and hasattr(submission, 'selftext'):
-                        body_text = submission.selftext
-                except:
-                    body_text = "" # Default to empty string if there's an error
-                    
-                combined_text = f"{title_text} {body_text}"
-                
-                # Check if we need to filter by keyword
-                if keyword and keyword.lower() not in combined_text.lower():
-                    continue
-                
-                # Analyze sentiment with error handling
-                try:
-                    title_sentiment = analyze_text_sentiment(title_text)
-                    
-                    if body_text:
-                        body_sentiment = analyze_text_sentiment(body_text)
-                        # Average the sentiment for title and body
-                        avg_polarity = (title_sentiment["polarity"] + body_sentiment["polarity"]) / 2
-                        
-                        if avg_polarity > 0.1:
-                            sentiment = "positive"
-                        elif avg_polarity < -0.1:
-                            sentiment = "negative"
-                        else:
-                            sentiment = "neutral"
-                    else:
-                        avg_polarity = title_sentiment["polarity"]
-                        sentiment = title_sentiment["sentiment"]
-                except Exception as e:
-                    logger.error(f"Error analyzing sentiment for post {submission.id}: {e}")
-                    # Default to neutral if sentiment analysis fails
-                    avg_polarity = 0
-                    sentiment = "neutral"
+                avg_polarity, sentiment = score_post(post)
                 
                 # Increment counter
                 sentiment_counts[sentiment] += 1
                 
-                # Get author name safely
-                try:
-                    author_name = submission.author.name if hasattr(submission, 'author') and submission.author else "[deleted]"
-                except:
-                    author_name = "[deleted]"
-                
-                # Create post result with safe attribute access
                 post_result = {
-                    "id": getattr(submission, 'id', 'unknown'),
-                    "title": getattr(submission, 'title', 'Unknown Title'),
-                    "author": author_name,
-                    "created_utc": getattr(submission, 'created_utc', 0),
-                    "score": getattr(submission, 'score', 0),
-                    "num_comments": getattr(submission, 'num_comments', 0),
-                    "permalink": getattr(submission, 'permalink', ''),
+                    "id": post["id"],
+                    "title": post["title"] or "Unknown Title",
+                    "author": post["author"],
+                    "created_utc": post["created_utc"],
+                    "score": post["score"],
+                    "num_comments": post["num_comments"],
+                    "permalink": post["permalink"],
                     "polarity": avg_polarity,
                     "sentiment": sentiment
                 }
@@ -172,6 +181,7 @@ def analyze_subreddit_sentiment(subreddit_name, keyword=None, limit=100):
         return {
             "subreddit": subreddit_name,
             "keyword": keyword if keyword else None,
+            "source": source,
             "posts_analyzed": posts_analyzed,
             "sentiment_counts": sentiment_counts,
             "sentiment_percentages": sentiment_percentages,